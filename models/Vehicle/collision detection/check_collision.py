@@ -6,17 +6,19 @@ for collision with the corresponding scenario. Also includes visualization optio
 
 # General imports
 import os
-import gc
+import functools
 import argparse
 import matplotlib.pyplot as plt
+from matplotlib.animation import FuncAnimation, FFMpegWriter, PillowWriter
 import numpy as np
-from csv import reader
+import shapely
 import glob
+from concurrent.futures import ProcessPoolExecutor
 try:
-    from celluloid import Camera
-    CELLULOID_AVAILABILITY = True
-except:
-    CELLULOID_AVAILABILITY = False
+    import pandas as pd
+    PANDAS_AVAILABILITY = True
+except ImportError:
+    PANDAS_AVAILABILITY = False
 
 # commonroad specific imports
 # from commonroad_dc.collision.visualization.draw_dispatch import draw_object
@@ -24,8 +26,8 @@ from commonroad.visualization.mp_renderer import MPRenderer
 from commonroad_dc.collision.collision_detection.pycrcc_collision_dispatch \
         import create_collision_checker, create_collision_object
 from commonroad_dc.boundary import boundary
-from commonroad.prediction.prediction import SetBasedPrediction, Occupancy
-from commonroad.geometry.shape import Polygon, ShapeGroup
+from commonroad_dc import pycrcc
+from commonroad.geometry.shape import Polygon
 from commonroad.common.file_reader import CommonRoadFileReader
 
 
@@ -36,6 +38,12 @@ __maintainer__ = "Niklas Kochdumper"
 __email__ = "niklas.kochdumper@tum.de"
 __status__ = "Released"
 
+# Shapely 2.0 provides vectorized constructors for whole arrays of geometries
+SHAPELY_VECTORIZED = int(shapely.__version__.split('.')[0]) >= 2
+
+# only every n-th time step is rendered in animations of predictions without collisions
+ANIMATION_STRIDE = 5
+
 
 def load_scenario(scenario_path, verbose=False):
     """Load scenario and return CommonRoad scenario object and step_size.
@@ -59,14 +67,144 @@ def load_scenario(scenario_path, verbose=False):
 
     return scenario, step_size
 
+@functools.lru_cache(maxsize=32)
+def load_collision_scenario(scenario_path, verbose=False):
+    """ Load scenario together with its collision checker and road boundary.
+
+    The results are cached per scenario path, so that solutions to the same scenario share the
+    collision checker and the expensive triangulation of the road boundary.
+
+    :param scenario_path: path to scenario to be loaded
+    :param verbose: boolean flag determining verbosity
+    :return: commonroad scenario object, step_size of that scenario, commonroad collision_checker object
+             containing scenario objects and commonroad road_boundary_obstacle containing the road boundary
+    """
+
+    scenario, step_size = load_scenario(scenario_path, verbose=verbose)
+    # create collision checker using the scenario
+    cc = create_collision_checker(scenario)
+    # create road boundary obstacle
+    road_boundary_obstacle, road_boundary_sg_triangles = boundary.create_road_boundary_obstacle(
+            scenario, method='triangulation')
+
+    return scenario, step_size, cc, road_boundary_sg_triangles
+
+def solution_scenario_path(path_occupancy_csv):
+    """ Return the path to the scenario a solution belongs to.
+
+    :param path_occupancy_csv: path to solution
+    :return: path to the scenario
+    """
+
+    # os.path.join(path, 'code', path_occupancy_csv.split('/')[-1].replace('_occupancies.csv', '.xml'))
+    return '/code/BEL_Putte-4_2_T-1.xml'
+
+def create_polygons(vertices_list):
+    """ Create commonroad polygons from a list of vertex arrays.
+
+    With Shapely 2.0 the shapely polygons are built in a single vectorized call and wrapped without
+    running the constructor of the commonroad polygon again; otherwise each polygon is constructed separately.
+
+    :param vertices_list: list of arrays with the vertices [[x_0, y_0], [x_1, y_1], ...] of each polygon
+    :return: list of commonroad Polygon objects
+    """
+
+    if not SHAPELY_VECTORIZED or len(vertices_list) == 0:
+        return [Polygon(vertices) for vertices in vertices_list]
+
+    # the constructor can only be bypassed if the wrapper stores nothing but the attributes set below
+    template = Polygon(vertices_list[0])
+    if set(vars(template)) != {'_vertices', '_min', '_max', '_shapely_polygon'}:
+        return [template] + [Polygon(vertices) for vertices in vertices_list[1:]]
+
+    n_vertices = np.array([len(vertices) for vertices in vertices_list])
+    coords = np.concatenate(vertices_list)
+    offsets = np.concatenate([[0], np.cumsum(n_vertices)[:-1]])
+    rings = shapely.linearrings(coords, indices=np.repeat(np.arange(len(vertices_list)), n_vertices))
+    shapely_polygons = shapely.polygons(rings)
+    counter_clockwise = shapely.is_ccw(rings)
+    mins = np.minimum.reduceat(coords, offsets, axis=0)
+    maxs = np.maximum.reduceat(coords, offsets, axis=0)
+
+    polygon_list = [template]
+    for k in range(1, len(vertices_list)):
+        vertices = vertices_list[k]
+        # same convention as the constructor: sorted clockwise, first and last point are the same
+        if not np.array_equal(vertices[0], vertices[-1]):
+            vertices = np.vstack([vertices, vertices[:1]])
+        if counter_clockwise[k]:
+            vertices = vertices[::-1].copy()
+
+        polygon = Polygon.__new__(Polygon)
+        polygon._vertices = vertices
+        polygon._min = mins[k]
+        polygon._max = maxs[k]
+        polygon._shapely_polygon = shapely_polygons[k]
+        polygon_list.append(polygon)
+
+    return polygon_list
+
+def occupancy_schedule(time_start, time_end, step_size):
+    """ Assign the occupancies to the time steps of the scenario based on their time intervals only.
+
+    :param time_start: array with the start times of the occupancies
+    :param time_end: array with the end times of the occupancies
+    :param step_size: underlying timespan of a timestep in the respective scenario
+    :return: array with the occupancy indices of all shape groups in order, array with the end of
+             each completed shape group within the former array, and array with the indices of the
+             coinciding occupancies
+    """
+
+    n_polygons = time_start.shape[0]
+    members = np.empty(2*n_polygons, dtype=np.int64)
+    group_ends = np.empty(n_polygons, dtype=np.int64)
+    coinciding_indices = np.empty(n_polygons, dtype=np.int64)
+    n_members = 0
+    n_groups = 0
+    n_coinciding = 0
+    scenario_time_step = 0.0
+
+    for k in range(n_polygons):
+        if time_end[k] < scenario_time_step:
+            members[n_members] = k
+            n_members += 1
+
+        elif time_end[k] == scenario_time_step:
+            members[n_members] = k
+            n_members += 1
+            group_ends[n_groups] = n_members
+            n_groups += 1
+
+        elif time_start[k] <= scenario_time_step:
+            members[n_members] = k
+            n_members += 1
+            group_ends[n_groups] = n_members
+            n_groups += 1
+            members[n_members] = k
+            n_members += 1
+
+        else:
+            raise Exception('Unexpected behaviour: Time intervals appear not to be in chronological order.')
+
+        if (time_end[k] >= scenario_time_step) and (time_start[k] <= scenario_time_step):
+            coinciding_indices[n_coinciding] = k
+            n_coinciding += 1
+            scenario_time_step = scenario_time_step + step_size
+
+    return members[:n_members], group_ends[:n_groups], coinciding_indices[:n_coinciding]
+
 def read_occupancy_csv(path_occupancy_csv, step_size=None, verbose=False):
-    """ Create occupancy based prediction objects from csv for later collision checking.
+    """ Create occupancy based collision objects from csv for later collision checking.
+
+    Each polygon is converted into a collision object only once and shared between the coinciding
+    and the cumulative collision object.
     
     :param path_occupancy_csv: path to solution to be loaded
     :param step_size: underlying timespan of a timestep in the respective scenario
     :param verbose: boolean flag determining verbosity
-    :return: returns commonroad OccupancyPrediction objects containing only coinciding occupancies
-             and cumulative occupancies (all occupancies before each time step)
+    :return: returns pycrcc TimeVariantCollisionObjects containing only coinciding occupancies
+             and cumulative occupancies (all occupancies before each time step), and an array of
+             shape (time steps, vertices, 2) with the vertices of the coinciding occupancies
     """
 
     if '.csv' not in path_occupancy_csv:
@@ -77,66 +215,138 @@ def read_occupancy_csv(path_occupancy_csv, step_size=None, verbose=False):
         scenario_path = os.path.join(path,'data','scenarios', path_occupancy_csv.split('/')[-2] + '.xml')
         _, step_size = load_scenario(scenario_path, verbose=verbose)
     
-    occupancies_cumulative = list()
-    occupancies_coinciding = list()
-    shape_list = list()
-    scenario_time_step = 0
-
-    # open file containing vertices of occupancies
-    with open(path_occupancy_csv, 'r') as read_obj:
-        csv_reader = reader(read_obj, delimiter=',')
-        flag = 1
-        for row in csv_reader:
-            if flag == 1:
-                time_buf = [-1,-1]
-                time_buf[0] = float(row[0])
-                points_buffer = row[1:]
-            elif flag == -1:
-                time_buf[1] = float(row[0])
-                vertices = np.array([points_buffer, row[1:]], dtype=float).transpose()
-                step_size_prediction = np.around(time_buf[1] - time_buf[0], 5)
-
-                assert (step_size >= step_size_prediction),\
-                    'Step size of solution must currently be smaller or equal to global step size.'
-                assert step_size_prediction >= 0, 'invalid time interval'
-                
-                current_polygon = Polygon(vertices)           
-                
-                if (scenario_time_step == 0) and (time_buf[0] == 0):
-                    occupancies_cumulative.append(
-                            Occupancy(int(scenario_time_step/step_size), ShapeGroup(shape_list)))
-                
-                if time_buf[1] < scenario_time_step:
-                    shape_list.append(current_polygon)
-                    
-                elif time_buf[1] == scenario_time_step:
-                    shape_list.append(current_polygon)
-                    occupancies_cumulative.append(
-                        Occupancy(int(scenario_time_step/step_size), ShapeGroup(shape_list)))
-                    shape_list = []
-                    
-                elif time_buf[0] <= scenario_time_step:
-                    shape_list.append(current_polygon)
-                    occupancies_cumulative.append(
-                        Occupancy(int(scenario_time_step/step_size), ShapeGroup(shape_list)))
-                    shape_list = []
-                    shape_list.append(current_polygon)
-                    
-                else:
-                    raise Exception('Unexpected behaviour: Time intervals appear not to be in chronological order.')
-                
-                if (time_buf[1] >= scenario_time_step) and (time_buf[0] <= scenario_time_step):
-                    occupancies_coinciding.append(Occupancy(int(scenario_time_step/step_size), current_polygon))
-                    scenario_time_step = scenario_time_step + step_size
-                
-            flag *= -1
-            
-    occupancy_coinciding_prediction = SetBasedPrediction(0, occupancies_coinciding)
-    occupancy_cumulative_prediction = SetBasedPrediction(0, occupancies_cumulative)
-
-    return occupancy_coinciding_prediction, occupancy_cumulative_prediction
-
-def make_animation(scenario, cc, co, road_boundary_sg_triangles, output_path=None, verbose=False):
+    # load time stamps and vertices of all occupancies at once; rows of polygons with fewer
+    # vertices are either padded with empty cells or shorter if the trailing commas were removed,
+    # missing cells are read as NaN in both cases
+    with open(path_occupancy_csv) as csv_file:
+        lines = [line.rstrip() for line in csv_file if line.strip()]
+    n_columns = max(line.count(',') for line in lines) + 1
+
+    if PANDAS_AVAILABILITY:
+        # the C parser of pandas is faster than numpy for large solutions; the number of columns is
+        # given explicitly since pandas otherwise takes it from the first line
+        data = pd.read_csv(path_occupancy_csv, header=None, names=range(n_columns),
+                           dtype=np.float64).to_numpy()
+    else:
+        lines = [line + ',' * (n_columns - 1 - line.count(',')) for line in lines]
+        data = np.atleast_2d(np.genfromtxt(lines, delimiter=','))
+    times = data[:, 0]
+    verts = data[:, 1:]
+
+    # consecutive rows contain the x- and y-coordinates of one polygon; they are copied into one
+    # contiguous array for vectorized operations on whole trajectories, where polygons with fewer
+    # vertices repeat their last vertex, which leaves their bounding boxes unchanged
+    n_polygons = data.shape[0] // 2
+    n_vertices = np.count_nonzero(~np.isnan(verts[0:2*n_polygons:2]), axis=1)
+    vertices_array = np.empty((n_polygons, verts.shape[1], 2))
+    vertices_array[:, :, 0] = verts[0:2*n_polygons:2]
+    vertices_array[:, :, 1] = verts[1:2*n_polygons:2]
+    padding = np.arange(verts.shape[1]) >= n_vertices[:, np.newaxis]
+    last_vertices = vertices_array[np.arange(n_polygons), n_vertices-1]
+    vertices_array[padding] = np.broadcast_to(last_vertices[:, np.newaxis], vertices_array.shape)[padding]
+
+    # the vertices of each polygon are views into the array
+    vertices_list = [vertices[:n] for vertices, n in zip(vertices_array, n_vertices)]
+    polygon_list = create_polygons(vertices_list)
+
+    time_start = times[0:2*n_polygons:2]
+    time_end = times[1:2*n_polygons:2]
+    step_size_prediction = np.around(time_end - time_start, 5)
+
+    assert np.all(step_size >= step_size_prediction),\
+        'Step size of solution must currently be smaller or equal to global step size.'
+    assert np.all(step_size_prediction >= 0), 'invalid time interval'
+
+    members, group_ends, coinciding_indices = occupancy_schedule(time_start, time_end, float(step_size))
+
+    shape_list = [create_collision_object(polygon) for polygon in polygon_list]
+
+    occupancy_coinciding = pycrcc.TimeVariantCollisionObject(0)
+    for k in coinciding_indices:
+        occupancy_coinciding.append_obstacle(shape_list[k])
+
+    shape_groups = list()
+    for group_start, group_end in zip(np.concatenate(([0], group_ends)), np.append(group_ends, len(members))):
+        shape_group = pycrcc.ShapeGroup()
+        for k in members[group_start:group_end]:
+            shape_group.add_shape(shape_list[k])
+        shape_groups.append(shape_group)
+
+    # the last shape group is still open and only used if the initial time step repeats the first
+    # group, which happens if the first occupancy starts at time zero
+    occupancies_cumulative = shape_groups[:-1]
+    if n_polygons > 0 and time_start[0] == 0:
+        occupancies_cumulative.insert(0, shape_groups[0])
+
+    occupancy_cumulative = pycrcc.TimeVariantCollisionObject(0)
+    for shape_group in occupancies_cumulative:
+        occupancy_cumulative.append_obstacle(shape_group)
+
+    return occupancy_coinciding, occupancy_cumulative, vertices_array[coinciding_indices]
+
+def classify_frame(i, cc, co, road_boundary_sg_triangles):
+    """ Check the prediction occupancy at a single frame for collisions.
+
+    :param i: frame (time step) to be classified
+    :param cc: commonroad collision_checker object containing scenario objects
+    :param co: commonoad collision_object object containing the prediction occupancies
+    :param road_boundary_sg_triangles: commonroad road_boundary_obstacle containing the road boundary
+    :return: booleans c_obstacle (true if colliding with an obstacle) and c_boundary (true if colliding
+             with the road boundary); the road boundary is only checked if no obstacle collides
+    """
+
+    obstacle = co.obstacle_at_time(i)
+
+    c_obstacle = cc.time_slice(i).collide(obstacle)
+    c_boundary = not c_obstacle and road_boundary_sg_triangles.collide(obstacle)
+
+    return c_obstacle, c_boundary
+
+def classify_frames(cc, co, road_boundary_sg_triangles, frames):
+    """ Classify all frames of the animation or plot.
+
+    :param cc: commonroad collision_checker object containing scenario objects
+    :param co: commonoad collision_object object containing the prediction occupancies
+    :param road_boundary_sg_triangles: commonroad road_boundary_obstacle containing the road boundary
+    :param frames: frames (time steps) to be classified
+    :return: array with the colour of each frame ('red' for a collision with an obstacle, 'yellow' for
+             a collision with the road boundary and 'green' otherwise)
+    """
+
+    collisions = [classify_frame(i, cc, co, road_boundary_sg_triangles) for i in frames]
+
+    c_obstacles, c_boundary = np.array(collisions, dtype=bool).reshape(-1, 2).T
+    colours = np.where(c_obstacles, 'red', np.where(c_boundary, 'yellow', 'green'))
+
+    return colours
+
+def plot_limits(scenario, road_boundary_sg_triangles, occupancy_vertices=None, margin=0.05):
+    """ Compute fixed plot limits enclosing the lanelet network, the road boundary and the prediction.
+
+    :param scenario: commonroad scenario object from underlying scenario
+    :param road_boundary_sg_triangles: commonroad road_boundary_obstacle containing the road boundary
+    :param occupancy_vertices: vertices of the prediction occupancies per time step
+    :param margin: relative margin added on each side, as with matplotlib's autoscaling
+    :return: plot limits [x_min, x_max, y_min, y_max]
+    """
+
+    points = [np.vstack([lanelet.left_vertices, lanelet.right_vertices])
+              for lanelet in scenario.lanelet_network.lanelets]
+    points.append(np.array([triangle.vertices() for triangle in road_boundary_sg_triangles.unpack()]).reshape(-1, 2))
+    if occupancy_vertices is not None:
+        points.append(occupancy_vertices.reshape(-1, 2))
+
+    points = np.concatenate(points)
+    lower = points.min(axis=0)
+    upper = points.max(axis=0)
+    padding = margin * (upper - lower)
+    lower = lower - padding
+    upper = upper + padding
+
+    return [lower[0], upper[0], lower[1], upper[1]]
+
+def make_animation(scenario, cc, co, road_boundary_sg_triangles, output_path=None, verbose=False,
+                   occupancy_vertices=None, has_collision=True):
     """ Make 'video' saved as a gif from solution to scenario given.
     
     :param scenario: commonroad scenario object from underlying scenario
@@ -145,6 +355,9 @@ def make_animation(scenario, cc, co, road_boundary_sg_triangles, output_path=Non
     :param road_boundary_sg_triangles: commonroad road_boundary_obstacle containing the road boundary
     :param output_path: path to store the output gif to
     :param verbose: boolean flag determining verbosity
+    :param occupancy_vertices: vertices of the prediction occupancies per time step (for the plot limits)
+    :param has_collision: result of the collision check of the whole prediction; if false, all frames
+                          are collision free and only every ANIMATION_STRIDE-th frame is rendered
     """
 
     if output_path is None:
@@ -152,43 +365,62 @@ def make_animation(scenario, cc, co, road_boundary_sg_triangles, output_path=Non
     elif '.gif' not in output_path:
         output_path = output_path + '.gif'
     
+    if has_collision:
+        frames = range(co.time_start_idx(), co.time_end_idx()+1)
+        colours = classify_frames(cc, co, road_boundary_sg_triangles, frames)
+        fps = 2
+    else:
+        # the playback speed is kept by showing the remaining frames for longer
+        frames = range(co.time_start_idx(), co.time_end_idx()+1, ANIMATION_STRIDE)
+        colours = np.full(len(frames), 'green')
+        fps = 2 / ANIMATION_STRIDE
+    obstacles = [co.obstacle_at_time(i) for i in frames]
+    time_slices = [cc.time_slice(i) for i in frames]
+
     fig = plt.figure(figsize=(20,20))
-    camera = Camera(fig)
 
-    for i in np.arange(co.time_start_idx(), co.time_end_idx()+1):
-        #print(i)
+    # the static scenery is drawn once and stays in the background of all frames; the plot limits are
+    # fixed beforehand instead of autoscaling every frame
+    rnd = MPRenderer(plot_limits=plot_limits(scenario, road_boundary_sg_triangles, occupancy_vertices))
+    #draw_object(scenario.lanelet_network)
+    scenario.lanelet_network.draw(rnd)
+    #draw_object(road_boundary_sg_triangles)
+    road_boundary_sg_triangles.draw(rnd)
+    rnd.render()
+
+    # only the artists of the current frame are kept; they are replaced by those of the next frame
+    frame_artists = list()
+
+    def init_frame():
+        return frame_artists
+
+    def update_frame(k):
+        #print(frames[k])
         if True:
-            show_progress_movie(i, co.time_end_idx()+1)
-        rnd = MPRenderer()
-        #draw_object(scenario.lanelet_network)
-        scenario.lanelet_network.draw(rnd)
-        #draw_object(road_boundary_sg_triangles)
-        road_boundary_sg_triangles.draw(rnd)
-        if cc.time_slice(i).collide(co.obstacle_at_time(i)):
-            # draw_object(co.obstacle_at_time(i), draw_params={'collision': {'facecolor': 'red'}})
-            rnd.draw_params.shape.facecolor = "red"
-            co.obstacle_at_time(i).draw(rnd)
-        elif road_boundary_sg_triangles.collide(co.obstacle_at_time(i)):
-            #draw_object(co.obstacle_at_time(i), draw_params={'collision': {'facecolor': 'yellow'}})
-            rnd.draw_params.shape.facecolor = "yellow"
-            co.obstacle_at_time(i).draw(rnd)
-        else:
-            #draw_object(co.obstacle_at_time(i), draw_params={'collision': {'facecolor': 'green'}})
-            rnd.draw_params.shape.facecolor = "green"
-            co.obstacle_at_time(i).draw(rnd)
+            show_progress_movie(frames[k], co.time_end_idx()+1)
+        for artist in frame_artists:
+            artist.remove()
+        rnd.draw_params.shape.facecolor = colours[k]
+        obstacles[k].draw(rnd)
         #draw_object(cc.time_slice(i), draw_params={'collision': {'facecolor': 'blue'}})
         rnd.draw_params.shape.facecolor = "blue"
-        cc.time_slice(i).draw(rnd)
-        rnd.render()
-        plt.autoscale()
-        plt.axis('equal')
-        camera.snap()
+        time_slices[k].draw(rnd)
+        # only the dynamic objects are added to the axis; copy the list since clearing the renderer empties it
+        frame_artists[:] = rnd.render_dynamic()
+        rnd.clear()
+        return frame_artists
+
+    animation = FuncAnimation(fig, update_frame, frames=len(frames), init_func=init_frame, blit=True,
+                              cache_frame_data=False)
+    # frames are streamed to ffmpeg if it is installed
+    if FFMpegWriter.isAvailable():
+        writer = FFMpegWriter(fps=fps)
+    else:
+        writer = PillowWriter(fps=fps)
+    animation.save(output_path, writer=writer)
 
     if True:   
         print('                                                               ', end='\r')
-
-    animation = camera.animate()
-    animation.save(output_path, fps=2)
     if verbose:
         print('Animation saved under ' + output_path)
 
@@ -208,43 +440,34 @@ def show_progress_movie(current, total, barLength = 20):
 
     print('Progress writing gif animation: [%s%s] %d %%' % (arrow, spaces, percent), end='\r')
 
-def plot_scene(scenario, cc, co, road_boundary_sg_triangles):
+def plot_scene(scenario, cc, co, road_boundary_sg_triangles, occupancy_vertices=None):
     """ Plot scenario and solution in single figure.
     
     :param scenario: commonroad scenario object from underlying scenario
     :param cc: commonroad collision_checker object containing scenario objects
     :param co: commonoad collision_object object containing the prediction occupancies
     :param road_boundary_sg_triangles: commonroad road_boundary_obstacle containing the road boundary
+    :param occupancy_vertices: vertices of the prediction occupancies per time step (for the plot limits)
     """
 
+    frames = range(co.time_start_idx(), co.time_end_idx()+1)
+    colours = classify_frames(cc, co, road_boundary_sg_triangles, frames)
+    obstacles = [co.obstacle_at_time(i) for i in frames]
+
     plt.figure(figsize=(25, 10))
-    rnd = MPRenderer()
+    rnd = MPRenderer(plot_limits=plot_limits(scenario, road_boundary_sg_triangles, occupancy_vertices))
     #draw_object(scenario.lanelet_network)
     scenario.lanelet_network.draw(rnd)
     #draw_object(road_boundary_sg_triangles)
     road_boundary_sg_triangles.draw(rnd)
-    for i in np.arange(co.time_start_idx(), co.time_end_idx()+1):
-        if cc.time_slice(i).collide(co.obstacle_at_time(i)):
-            #draw_object(co.obstacle_at_time(i), draw_params={'collision': {'facecolor': 'red','edgecolor': 'none'}})
-            rnd.draw_params.shape.facecolor = "red"
-            rnd.draw_params.shape.edgecolor = "none"
-            co.obstacle_at_time(i).draw(rnd)
-        elif road_boundary_sg_triangles.collide(co.obstacle_at_time(i)):
-            #draw_object(co.obstacle_at_time(i), draw_params={'collision': {'facecolor': 'yellow','edgecolor': 'none'}})
-            rnd.draw_params.shape.facecolor = "yellow"
-            rnd.draw_params.shape.edgecolor = "none"
-            co.obstacle_at_time(i).draw(rnd)
-        else:
-            #draw_object(co.obstacle_at_time(i), draw_params={'collision': {'facecolor': 'green','edgecolor': 'none'}})
-            rnd.draw_params.shape.facecolor = "green"
-            rnd.draw_params.shape.edgecolor = "none"
-            co.obstacle_at_time(i).draw(rnd)
+    for i in frames:
+        rnd.draw_params.shape.facecolor = colours[i-frames[0]]
+        rnd.draw_params.shape.edgecolor = "none"
+        obstacles[i-frames[0]].draw(rnd)
     #draw_object(cc, draw_params={'collision': {'facecolor': 'blue'}})
     rnd.draw_params.shape.facecolor = "blue"
     cc.draw(rnd)
     rnd.render()
-    plt.autoscale()
-    plt.axis('equal')
     plt.show()
 
 def occupancy_collision_checker(path_occupancy_csv, verbose=False, animation=False, plot=False):
@@ -259,20 +482,11 @@ def occupancy_collision_checker(path_occupancy_csv, verbose=False, animation=Fal
     """
 
     path, file = os.path.split(os.getcwd())
-    scenario_path = '/code/BEL_Putte-4_2_T-1.xml'
-    # os.path.join(path, 'code', path_occupancy_csv.split('/')[-1].replace('_occupancies.csv', '.xml'))
+    scenario_path = solution_scenario_path(path_occupancy_csv)
     
-    scenario, step_size = load_scenario(scenario_path, verbose=verbose)
-    occupancy_coinciding_prediction, occupancy_cumulative_prediction = read_occupancy_csv(
-            path_occupancy_csv, step_size=step_size)
-        
-    # create collision checker using the scenario
-    cc = create_collision_checker(scenario)
+    scenario, step_size, cc, road_boundary_sg_triangles = load_collision_scenario(scenario_path, verbose=verbose)
     # create a collision objects using the trajectory prediction of the ego vehicle
-    co = create_collision_object(occupancy_coinciding_prediction)
-    # create road boundary obstacle
-    road_boundary_obstacle, road_boundary_sg_triangles = boundary.create_road_boundary_obstacle(
-            scenario, method='triangulation')
+    co, co_cumulative, occupancy_vertices = read_occupancy_csv(path_occupancy_csv, step_size=step_size)
 
     # test the trajectory of the ego vehicle for collisions with obstacles or the road boundary
     c_boundary = road_boundary_sg_triangles.collide(co)
@@ -293,10 +507,11 @@ def occupancy_collision_checker(path_occupancy_csv, verbose=False, animation=Fal
             os.mkdir(animationDir_path)
         name = path_occupancy_csv.split('/')[-1].replace('occupancies.csv', 'animation.gif')
         animation_path = os.path.join(animationDir_path,name)
-        make_animation(scenario, cc, co, road_boundary_sg_triangles, verbose=verbose, output_path=animation_path)
+        make_animation(scenario, cc, co, road_boundary_sg_triangles, verbose=verbose, output_path=animation_path,
+                       occupancy_vertices=occupancy_vertices, has_collision=c_obstacles or c_boundary)
 
     if plot:
-        plot_scene(scenario, cc, co, road_boundary_sg_triangles)
+        plot_scene(scenario, cc, co, road_boundary_sg_triangles, occupancy_vertices=occupancy_vertices)
 
     return c_obstacles, c_boundary
     
@@ -320,15 +535,21 @@ if __name__ == "__main__":
 
     if args.path_occupancy_csv is None:
         solution_list = sorted(glob.glob(os.path.join(path,'results','*_occupancies.csv')))
+        # solutions to the same scenario are checked one after another to reuse the cached scenario
+        solution_list = sorted(solution_list, key=solution_scenario_path)
         num_solutions = len(solution_list)
         counter = 0
         collisions = 0
         print('Collision Checker ------------------------------------------------')
 
-        for solution in solution_list:
+        # the solutions are independent and checked in parallel; each worker receives a contiguous
+        # chunk of the sorted list, so it loads every scenario of its chunk only once
+        chunksize = max(1, -(-num_solutions // (os.cpu_count() or 1)))
+        with ProcessPoolExecutor() as executor:
+            results = list(executor.map(occupancy_collision_checker, solution_list, chunksize=chunksize))
+
+        for solution, (c_o, c_b) in zip(solution_list, results):
 
-            c_o, c_b = occupancy_collision_checker(solution)
-            gc.collect()
             counter += 1
 
             if c_o or c_b:
@@ -347,10 +568,6 @@ if __name__ == "__main__":
         print('Number of collisions: {} of {} scenarios     '.format(collisions, num_solutions))
 
     else:
-        if not CELLULOID_AVAILABILITY:
-            print('Celluloid package not available; animation cannot be created and option is deactivated.')
-            args.animation_path = False
-
         path_occupancy_csv = args.path_occupancy_csv
 
         if not '.csv' in path_occupancy_csv: